@@ -28,6 +28,9 @@ SERVICE_URLS = {
     "ethimask": "http://ethimask-service:8009",
 }
 
+# Upper bound of texts per Presidio /analyze/batch request (service limit)
+PRESIDIO_BATCH_MAX_TEXTS = 1000
+
 default_args = {
     'owner': 'data_governance_team',
     'depends_on_past': False,
@@ -168,20 +171,19 @@ def detect_pii_presidio(**context):
     
     data = preview_response.json()['preview']
     
-    # Analyze with Presidio
+    # Analyze with Presidio: one text per distinct cell value, sent in batches
     all_detections = []
-    # Batch processing optimization: Concat sample rows
-    texts = [" ".join(str(v) for v in row.values() if v) for row in data]
+    texts = list(dict.fromkeys(str(v) for row in data for v in row.values() if v))
     
-    # Simple loop for now
-    for text in texts:
+    for start in range(0, len(texts), PRESIDIO_BATCH_MAX_TEXTS):
         response = requests.post(
-            f"{SERVICE_URLS['presidio']}/analyze",
-            json={"text": text}
+            f"{SERVICE_URLS['presidio']}/analyze/batch",
+            json={"texts": texts[start:start + PRESIDIO_BATCH_MAX_TEXTS], "language": "fr", "score_threshold": 0.3},
+            timeout=120
         )
         if response.status_code == 200:
-            result = response.json()
-            all_detections.extend(result.get('detections', []))
+            for detections in response.json().get('results', []):
+                all_detections.extend(detections)
     
     print(f"✅ Presidio detected {len(all_detections)} entities")
     context['ti'].xcom_push(key='presidio_detections', value=all_detections)
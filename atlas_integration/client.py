@@ -1,12 +1,19 @@
 # atlas_integration/client.py
 
 import logging
+import time
+import threading
 import requests
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from atlas_integration.config import ATLAS_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Resolved dataset name -> GUID entries are reused for this long (seconds)
+GUID_CACHE_TTL = 600
+GUID_CACHE_MAXSIZE = 4096
+
 class AtlasClient:
     def __init__(self):
         base = ATLAS_CONFIG["BASE_URL"]
@@ -20,6 +27,9 @@ class AtlasClient:
         self.auth = (ATLAS_CONFIG["USERNAME"], ATLAS_CONFIG["PASSWORD"])
         self.timeout = ATLAS_CONFIG["TIMEOUT"]
         self.headers = {"Content-Type": "application/json"}
+        # LRU of name -> (guid, expires_at); shared by background tasks, hence the lock
+        self._guid_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._guid_cache_lock = threading.Lock()
         
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """Unified response handler with error logging"""
@@ -326,6 +336,25 @@ class AtlasClient:
             return False
 
     def get_entity_guid(self, name: str) -> Optional[str]:
+        # Memoized: only found GUIDs are cached, misses are retried next call
+        with self._guid_cache_lock:
+            cached = self._guid_cache.get(name)
+            if cached:
+                if cached[1] > time.monotonic():
+                    self._guid_cache.move_to_end(name)
+                    return cached[0]
+                del self._guid_cache[name]
+        
+        guid = self._lookup_entity_guid(name)
+        if guid:
+            with self._guid_cache_lock:
+                self._guid_cache[name] = (guid, time.monotonic() + GUID_CACHE_TTL)
+                self._guid_cache.move_to_end(name)
+                if len(self._guid_cache) > GUID_CACHE_MAXSIZE:
+                    self._guid_cache.popitem(last=False)
+        return guid
+
+    def _lookup_entity_guid(self, name: str) -> Optional[str]:
         # Enhanced helper: tries exact name, name with .csv, name without .csv
         candidates = [name]
         if name.endswith('.csv'):
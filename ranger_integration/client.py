@@ -16,12 +16,15 @@ class RangerClient:
         self.timeout = RANGER_CONFIG["TIMEOUT"]
         self.headers = {"Content-Type": "application/json"}
 
+        # One Session per client: TCP/TLS connections are reused across calls
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+
     def post(self, endpoint: str, payload: dict):
-        response = requests.post(
+        response = self.session.post(
             self.base_url + endpoint,
             json=payload,
-            headers=self.headers,
-            auth=self.auth,
             timeout=self.timeout
         )
         response.raise_for_status()
@@ -53,10 +56,10 @@ class RangerClient:
             
             # For HDP Sandbox often /api/policy/check is used with explicit resource def
             # Adapting to match common/ranger_client logic but with flexible endpoint
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/policy/check", 
                 json=policy_check, 
-                auth=self.auth
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -11,10 +11,12 @@ Features:
 """
 import uuid
 import random
+import itertools
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple
 from enum import Enum
 from collections import Counter
+from functools import lru_cache
 import requests
 
 import uvicorn
@@ -233,14 +235,19 @@ class AssignmentManager:
     
     async def assign_round_robin(self, users: List[str], count: int = None) -> List[Tuple[str, str]]:
         """Assign tasks using round-robin strategy"""
+        if not users:
+            return []
+        
         pending = await self.queue.get_pending_tasks()
         if count:
             pending = pending[:count]
         
+        # Walk the user ring from the last offset instead of a modulo per task
+        base = self.last_assigned_index
+        ring = itertools.islice(itertools.cycle(users), base, base + len(pending))
+        
         assignments = []
-        for i, task in enumerate(pending):
-            user = users[(self.last_assigned_index + i) % len(users)]
-            
+        for task, user in zip(pending, ring):
             await self.queue.update_task(
                 task.id,
                 assigned_to=user,
@@ -249,8 +256,7 @@ class AssignmentManager:
             )
             assignments.append((task.id, user))
         
-        if len(users) > 0:
-            self.last_assigned_index = (self.last_assigned_index + len(pending)) % len(users)
+        self.last_assigned_index = (base + len(pending)) % len(users)
         return assignments
     
     async def assign_load_based(self, users: List[str], max_per_user: int = 20) -> List[Tuple[str, str]]:
@@ -688,26 +694,32 @@ async def get_user_stats(user_id: str):
 # --------------------------------------------------------------------
 EXPORT_DIR = "/opt/airflow/datasets/certified"
 
+@lru_cache(maxsize=1)
+def _scan_exports(mtime_ns: int) -> Tuple[Dict[str, Any], ...]:
+    """Scan EXPORT_DIR once per directory mtime (scandir reuses the entry stat)"""
+    files = []
+    with os.scandir(EXPORT_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".csv") and entry.is_file():
+                stats = entry.stat()
+                files.append({
+                    "filename": entry.name,
+                    "size_kb": round(stats.st_size / 1024, 2),
+                    "created_at": datetime.fromtimestamp(stats.st_mtime).isoformat(),
+                    "type": "Golden Records (CSV)"
+                })
+    
+    # Sort by newest first
+    return tuple(sorted(files, key=lambda x: x["created_at"], reverse=True))
+
 @app.get("/exports")
 async def list_exports():
     """List all available CSV exports on disk"""
     if not os.path.exists(EXPORT_DIR):
         return []
     
-    files = []
-    for f in os.listdir(EXPORT_DIR):
-        if f.endswith(".csv"):
-            path = os.path.join(EXPORT_DIR, f)
-            stats = os.stat(path)
-            files.append({
-                "filename": f,
-                "size_kb": round(stats.st_size / 1024, 2),
-                "created_at": datetime.fromtimestamp(stats.st_mtime).isoformat(),
-                "type": "Golden Records (CSV)"
-            })
-    
-    # Sort by newest first
-    return sorted(files, key=lambda x: x["created_at"], reverse=True)
+    # Directory mtime changes whenever an export is added/removed -> cache key
+    return [dict(f) for f in _scan_exports(os.stat(EXPORT_DIR).st_mtime_ns)]
 
 @app.get("/exports/download/{filename}")
 async def download_export(filename: str):
@@ -1,10 +1,50 @@
+import asyncio
+import logging
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, Header
 from fastapi.security import OAuth2PasswordRequestForm
 
 from backend.database.mongodb import db
-from backend.auth.utils import verify_password, create_token, decode_token
+from backend.auth.utils import verify_and_update_password, dummy_verify_password, create_token, decode_token
 
 router = APIRouter(tags=["Authentication"])
+logger = logging.getLogger(__name__)
+
+# Single 401 message for unknown usernames and wrong passwords
+INVALID_CREDENTIALS = "Incorrect username or password"
+
+# AUDIT LOG BUFFER ------------------------------------
+# Audit events are queued and written in batches by audit_flusher (started
+# in main.py), so no login response waits on an audit_logs round-trip.
+AUDIT_BATCH_SIZE = 500
+audit_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+
+
+def log_audit_event(document: dict):
+    try:
+        audit_queue.put_nowait(document)
+    except asyncio.QueueFull:
+        # Drop rather than block: a flood of failed logins must not stall auth
+        logger.warning("Audit queue full, dropping %s event", document.get("action"))
+
+
+async def flush_audit_batch(batch: list):
+    try:
+        await db["audit_logs"].insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.error("Failed to write %d audit events: %s", len(batch), e)
+
+
+async def audit_flusher():
+    while True:
+        batch = [await audit_queue.get()]
+        try:
+            while len(batch) < AUDIT_BATCH_SIZE:
+                batch.append(audit_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            pass
+        await flush_audit_batch(batch)
 
 
 @router.get("/health")
@@ -15,52 +55,70 @@ async def health():
 # LOGIN ROUTE -----------------------------------------
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    from datetime import datetime
-    
-    print(f"🔐 Login attempt: username='{form_data.username}'")
+    logger.debug("Login attempt: username=%s", form_data.username)
     
     try:
-        user = await db["users"].find_one({"username": form_data.username})
-        print(f"   User found: {user is not None}")
+        user = await db["users"].find_one(
+            {"username": form_data.username},
+            {"_id": 0, "username": 1, "password": 1, "role": 1, "status": 1}
+        )
+        logger.debug("User found: %s", user is not None)
     except Exception as e:
-        print(f"   ❌ Database error: {e}")
+        logger.error("Database error during login: %s", e)
         raise HTTPException(status_code=503, detail="Database connection error. Please try again.")
 
     if not user:
-        print(f"   ❌ User '{form_data.username}' not found in database")
+        logger.debug("User %s not found in database", form_data.username)
+        # Spend the same hashing time as a real check (no timing hint on usernames)
+        await asyncio.to_thread(dummy_verify_password, form_data.password)
         # Log failed login attempt
-        await db["audit_logs"].insert_one({
+        log_audit_event({
             "service": "AUTH",
             "action": "LOGIN_FAILED",
             "user": form_data.username,
             "status": "WARNING",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcnow(),
             "details": {"reason": "User not found"}
         })
-        raise HTTPException(status_code=401, detail="User not found")
+        # Same response as a wrong password: the API does not reveal which usernames exist
+        raise HTTPException(status_code=401, detail=INVALID_CREDENTIALS)
 
-    print(f"   Checking password...")
-    if not verify_password(form_data.password, user["password"]):
-        print(f"   ❌ Password incorrect")
+    # Hash verification is CPU-bound: run it in the default thread pool
+    verified, new_hash = await asyncio.to_thread(
+        verify_and_update_password, form_data.password, user["password"]
+    )
+    if not verified:
+        logger.debug("Incorrect password for %s", form_data.username)
         # Log failed login attempt
-        await db["audit_logs"].insert_one({
+        log_audit_event({
             "service": "AUTH",
             "action": "LOGIN_FAILED",
             "user": form_data.username,
             "status": "WARNING",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcnow(),
             "details": {"reason": "Incorrect password"}
         })
-        raise HTTPException(status_code=401, detail="Incorrect password")
-    
+        raise HTTPException(status_code=401, detail=INVALID_CREDENTIALS)
+
+    # Legacy sha256_crypt hash: migrate it to bcrypt now that we know the password
+    if new_hash:
+        try:
+            await db["users"].update_one(
+                {"username": user["username"]},
+                {"$set": {"password": new_hash}}
+            )
+        except Exception as e:
+            logger.error("Password rehash failed for %s: %s", user["username"], e)
+
+    # Account status is only disclosed to callers who know the password
     # block pending users
     if user.get("status") == "pending":
-        print(f"   ❌ User pending approval")
+        logger.debug("User %s pending approval", form_data.username)
         raise HTTPException(status_code=403, detail="Account awaiting admin approval")
 
     # block rejected users
     if user.get("status") == "rejected":
-        print(f"   ❌ User rejected")
+        logger.debug("User %s rejected", form_data.username)
         raise HTTPException(status_code=403, detail="Account rejected by admin")
     
     token = create_token({
@@ -69,16 +127,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     })
 
     # Log successful login
-    await db["audit_logs"].insert_one({
+    log_audit_event({
         "service": "AUTH",
         "action": "LOGIN_SUCCESS",
         "user": user["username"],
         "status": "INFO",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
         "details": {"role": user["role"]}
     })
 
-    print(f"   ✅ Login successful! Role: {user['role']}")
+    logger.debug("Login successful: username=%s role=%s", user["username"], user["role"])
     return {
         "access_token": token, 
         "token_type": "bearer",
@@ -100,6 +158,9 @@ async def get_token(authorization: str = Header(None)):
 
 # ROLE REQUIREMENT ------------------------------------
 def require_role(allowed_roles: list):
+    # Normalised once when the dependency is built, not on every request
+    allowed = frozenset(r.lower() for r in allowed_roles)
+
     async def role_checker(token: str = Depends(get_token)):
         payload = decode_token(token)
 
@@ -108,7 +169,7 @@ def require_role(allowed_roles: list):
 
         role = payload.get("role", "").lower()  # Convert to lowercase for comparison
 
-        if role not in allowed_roles:
+        if role not in allowed:
             raise HTTPException(status_code=403, detail="Access denied")
 
         return payload
@@ -116,24 +177,45 @@ def require_role(allowed_roles: list):
     return role_checker
 
 
+# Shared dependency instances, so every endpoint resolves the same callable
+admin_only = require_role(["admin"])
+
+
+# Accepted values for the admin update endpoints (lists kept for error messages)
+ASSIGNABLE_ROLES = ["admin", "steward", "annotator", "labeler"]
+USER_STATUSES = ["active", "pending", "rejected"]
+VALID_ROLE_SET = frozenset(ASSIGNABLE_ROLES)
+VALID_STATUS_SET = frozenset(USER_STATUSES)
+
+
 # GET ALL USERS (Admin only) -----------------------------
 @router.get("/users")
-async def get_all_users(payload: dict = Depends(require_role(["admin"]))):
+async def get_all_users(payload: dict = Depends(admin_only)):
     """Get all users - Admin only"""
     try:
-        users = await db["users"].find({}, {"password": 0}).to_list(length=100)
-        # Convert ObjectId to string
-        for user in users:
-            user["_id"] = str(user["_id"])
+        # Users page + counts computed server-side in one round-trip
+        pipeline = [{"$facet": {
+            "users": [
+                {"$project": {"password": 0}},
+                {"$limit": 100},
+                {"$addFields": {"_id": {"$toString": "$_id"}}}
+            ],
+            "by_role": [{"$group": {"_id": {"$toLower": "$role"}, "count": {"$sum": 1}}}],
+            "pending": [{"$match": {"status": "pending"}}, {"$count": "count"}]
+        }}]
+        result = (await db["users"].aggregate(pipeline).to_list(length=1))[0]
+
+        users = result["users"]
         
         # Count by role (case-insensitive)
+        by_role = {r["_id"]: r["count"] for r in result["by_role"]}
         stats = {
-            "total": len(users),
-            "admin": sum(1 for u in users if u.get("role", "").lower() == "admin"),
-            "steward": sum(1 for u in users if u.get("role", "").lower() == "steward"),
-            "annotator": sum(1 for u in users if u.get("role", "").lower() == "annotator"),
-            "labeler": sum(1 for u in users if u.get("role", "").lower() == "labeler"),
-            "pending": sum(1 for u in users if u.get("status") == "pending")
+            "total": sum(by_role.values()),
+            "admin": by_role.get("admin", 0),
+            "steward": by_role.get("steward", 0),
+            "annotator": by_role.get("annotator", 0),
+            "labeler": by_role.get("labeler", 0),
+            "pending": result["pending"][0]["count"] if result["pending"] else 0
         }
         
         return {"users": users, "stats": stats}
@@ -143,11 +225,10 @@ async def get_all_users(payload: dict = Depends(require_role(["admin"]))):
 
 # UPDATE USER ROLE (Admin only) --------------------------
 @router.put("/users/{username}/role")
-async def update_user_role(username: str, new_role: str, payload: dict = Depends(require_role(["admin"]))):
+async def update_user_role(username: str, new_role: str, payload: dict = Depends(admin_only)):
     """Update user role - Admin only"""
-    valid_roles = ["admin", "steward", "annotator", "labeler"]
-    if new_role not in valid_roles:
-        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {valid_roles}")
+    if new_role not in VALID_ROLE_SET:
+        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {ASSIGNABLE_ROLES}")
     
     result = await db["users"].update_one(
         {"username": username},
@@ -162,11 +243,10 @@ async def update_user_role(username: str, new_role: str, payload: dict = Depends
 
 # UPDATE USER STATUS (Admin only) ------------------------
 @router.put("/users/{username}/status")
-async def update_user_status(username: str, status: str, payload: dict = Depends(require_role(["admin"]))):
+async def update_user_status(username: str, status: str, payload: dict = Depends(admin_only)):
     """Approve or reject user - Admin only"""
-    valid_statuses = ["active", "pending", "rejected"]
-    if status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
+    if status not in VALID_STATUS_SET:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {USER_STATUSES}")
     
     result = await db["users"].update_one(
         {"username": username},
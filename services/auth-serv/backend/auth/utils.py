@@ -1,3 +1,7 @@
+import time
+import hashlib
+from collections import OrderedDict
+
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
@@ -6,8 +10,13 @@ SECRET_KEY = "SUPER_SECRET_KEY_ABC123"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-# FIX: use sha256_crypt instead of bcrypt
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+# Verification settings built once per process instead of on every decode
+_ALGORITHMS = [ALGORITHM]
+_DECODE_OPTIONS = {"require_exp": True, "require_sub": True}
+
+# New hashes use bcrypt; existing sha256_crypt hashes still verify.
+# bcrypt is pinned to 4.0.1 in requirements (passlib 1.7.4 breaks on >= 4.1).
+pwd_context = CryptContext(schemes=["bcrypt", "sha256_crypt"], deprecated="auto", bcrypt__rounds=12)
 
 def hash_password(password):
     print("DEBUG → password received:", password, type(password))
@@ -16,14 +25,50 @@ def hash_password(password):
 def verify_password(password, hashed):
     return pwd_context.verify(password, hashed)
 
+def verify_and_update_password(password, hashed):
+    """Verify and, for deprecated schemes (sha256_crypt), return a bcrypt rehash"""
+    return pwd_context.verify_and_update(password, hashed)
+
+# Reference hash for dummy_verify_password (computed once at import)
+_DUMMY_HASH = pwd_context.hash("dummy-password-for-timing")
+
+def dummy_verify_password(password):
+    """Run a full hash verification that always fails (unknown usernames)"""
+    pwd_context.verify(password, _DUMMY_HASH)
+    return False
+
 def create_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# Verified payloads keyed by a digest of the raw token, kept until the token's
+# own "exp". Only successful decodes are cached, so a signature is always
+# verified once before a token is trusted.
+TOKEN_CACHE_MAXSIZE = 1024
+_token_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+
 def decode_token(token: str):
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        payload, exp = cached
+        if exp > now:
+            _token_cache.move_to_end(key)
+            return dict(payload)  # callers never get the cached dict itself
+        _token_cache.pop(key, None)
+        return None  # expired
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS)
     except JWTError:
         return None
+
+    if "exp" in payload:
+        _token_cache[key] = (dict(payload), payload["exp"])
+        if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+            _token_cache.popitem(last=False)
+    return payload
@@ -11,7 +11,14 @@ MONGO_URL = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "datagov")
 
 try:
-    client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+    client = AsyncIOMotorClient(
+        MONGO_URL,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+        minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "5")),  # keep warm connections for the first logins
+        compressors="zlib",  # built into CPython, no extra wheel needed
+        retryWrites=True,
+    )
     db = client[DATABASE_NAME]
     print(f"✅ MongoDB Atlas connected!")
     print(f"   📁 Database: {DATABASE_NAME}")
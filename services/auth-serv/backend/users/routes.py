@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from backend.database.mongodb import db
 from backend.users.models import User, VALID_ROLES
 from backend.auth.utils import hash_password
-from backend.auth.routes import require_role
+from backend.auth.routes import admin_only
 
 router = APIRouter(tags=["Users"])
 
@@ -39,7 +39,7 @@ def serialize_user(user):
     return user
 
 
-@router.get("/pending", dependencies=[Depends(require_role(["admin"]))])
+@router.get("/pending", dependencies=[Depends(admin_only)])
 async def list_pending_users():
     users_cursor = db["users"].find({"status": "pending"})
     users = await users_cursor.to_list(None)
@@ -51,7 +51,7 @@ async def list_pending_users():
 
 
 
-@router.post("/approve/{username}", dependencies=[Depends(require_role(["admin"]))])
+@router.post("/approve/{username}", dependencies=[Depends(admin_only)])
 async def approve_user(username: str):
     result = await db["users"].update_one(
         {"username": username},
@@ -63,7 +63,7 @@ async def approve_user(username: str):
 
 
 
-@router.post("/reject/{username}", dependencies=[Depends(require_role(["admin"]))])
+@router.post("/reject/{username}", dependencies=[Depends(admin_only)])
 async def reject_user(username: str):
     result = await db["users"].update_one(
         {"username": username},
@@ -1,8 +1,11 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
-from backend.auth.routes import router as auth_router
+from backend.auth.routes import router as auth_router, audit_flusher, audit_queue, flush_audit_batch
 from backend.users.routes import router as user_router
 #username: steward1
 #password: Password123
@@ -12,7 +15,9 @@ from backend.users.routes import router as user_router
 #annotator
 
 #youness        123456789
-app = FastAPI()
+logging.basicConfig(level=logging.WARNING)
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 @app.middleware("http")
 async def set_root_path(request: Request, call_next):
@@ -30,6 +35,32 @@ def serve_login():
     return FileResponse("frontend/login.html")
 from backend.database.mongodb import db
 
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the indexes used by login and audit-log queries (idempotent)"""
+    if db is None:
+        return
+    try:
+        await db["users"].create_index("username", unique=True)
+        await db["audit_logs"].create_index([("timestamp", -1)])
+        await db["audit_logs"].create_index([("service", 1), ("timestamp", -1)])
+    except Exception as e:
+        logging.getLogger(__name__).warning("Index creation failed: %s", e)
+
+@app.on_event("startup")
+async def start_audit_flusher():
+    app.state.audit_flusher = asyncio.create_task(audit_flusher())
+
+@app.on_event("shutdown")
+async def stop_audit_flusher():
+    app.state.audit_flusher.cancel()
+    # Write whatever is still buffered
+    batch = []
+    while not audit_queue.empty():
+        batch.append(audit_queue.get_nowait())
+    if batch:
+        await flush_audit_batch(batch)
+
 @app.get("/test-db")
 async def test_db():
     try:
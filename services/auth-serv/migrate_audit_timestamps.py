@@ -0,0 +1,37 @@
+"""
+One-time migration: convert audit_logs.timestamp from ISO strings to BSON Dates
+Run once after deploying services that write native datetime timestamps,
+so sorting and range queries on the timestamp index see a single type.
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from dotenv import load_dotenv
+
+# Load .env from project root
+load_dotenv(dotenv_path=".env")
+load_dotenv(dotenv_path="../../.env")
+
+async def migrate_timestamps():
+    MONGO_URL = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+    DATABASE_NAME = os.getenv("DATABASE_NAME", "datagov")
+    
+    print(f"🔌 Connecting to MongoDB at {MONGO_URL}...")
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DATABASE_NAME]
+    
+    pending = await db["audit_logs"].count_documents({"timestamp": {"$type": "string"}})
+    print(f"📦 {pending} audit logs with string timestamps")
+    
+    if pending:
+        # Pipeline-style update: converted server-side, no documents pulled over the wire
+        result = await db["audit_logs"].update_many(
+            {"timestamp": {"$type": "string"}},
+            [{"$set": {"timestamp": {"$dateFromString": {"dateString": "$timestamp", "onError": "$timestamp"}}}}]
+        )
+        print(f"✅ Converted {result.modified_count} timestamps")
+    
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_timestamps())
@@ -11,7 +11,11 @@ MONGO_URL = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "datagov")
 
 try:
-    client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+    client = AsyncIOMotorClient(
+        MONGO_URL,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    )
     db = client[DATABASE_NAME]
     print(f"✅ Classification Service connected to MongoDB at {MONGO_URL}")
 except Exception as e:
@@ -1,17 +1,117 @@
 import os
 import re
+import copy
+import time
+import queue
+import hashlib
+import threading
 import joblib
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Dict, List, Optional
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 
 try:
-    from transformers import pipeline
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# File written by ORTQuantizer in <model_dir>/<lang>/onnx_int8
+ONNX_INT8_FILE = "model_quantized.onnx"
+
+# Intra-op threads per worker process for PyTorch inference
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "2"))
+
+# Classification results kept per (text digest, language); cleared on retrain
+RESULT_CACHE_MAXSIZE = int(os.getenv("CLASSIFIER_CACHE_SIZE", "10000"))
+
+# Micro-batching of concurrent transformer calls (per language pipeline)
+BATCH_MAX = int(os.getenv("CLASSIFIER_BATCH_MAX", "32"))
+BATCH_WAIT_MS = float(os.getenv("CLASSIFIER_BATCH_WAIT_MS", "5"))
+# Token cap for the semantic layer: sequence cost grows with length, and the
+# sentiment signal used here is carried by the start of the text
+TRANSFORMER_MAX_TOKENS = int(os.getenv("CLASSIFIER_MAX_TOKENS", "128"))
+
+class PipelineBatcher:
+    """
+    Runs single-text calls coming from concurrent classify threads through
+    one pipeline as batches of up to BATCH_MAX texts, waiting at most
+    BATCH_WAIT_MS for a batch to fill.
+    """
+
+    def __init__(self, clf_pipeline, max_batch: int = BATCH_MAX, wait_ms: float = BATCH_WAIT_MS):
+        self.pipeline = clf_pipeline
+        self.max_batch = max(1, max_batch)
+        self.wait_s = wait_ms / 1000
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def __call__(self, text: str) -> Dict:
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.wait_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.pipeline(
+                    [text for text, _ in batch],
+                    batch_size=len(batch),
+                    truncation=True,
+                    max_length=TRANSFORMER_MAX_TOKENS
+                )
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+def _build_keyword_table(groups: Dict[str, List[str]]):
+    """Flatten {group: [keywords]} into ((keyword, bit), ...) and {group: bit}"""
+    group_bits = {group: 1 << i for i, group in enumerate(groups)}
+    table = tuple((kw, group_bits[group]) for group, keywords in groups.items() for kw in keywords)
+    return table, group_bits
+
+def _build_keyword_automaton(table):
+    """Aho-Corasick automaton over the keyword table; each keyword maps to its OR-ed group bits"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    keyword_bits = {}
+    for kw, bit in table:
+        keyword_bits[kw] = keyword_bits.get(kw, 0) | bit
+    automaton = ahocorasick.Automaton()
+    for kw, bits in keyword_bits.items():
+        automaton.add_word(kw, bits)
+    automaton.make_automaton()
+    return automaton
+
 class EnsembleSensitivityClassifier:
     """
     Advanced Ensemble Classifier for PII/SPI Sensitivity.
@@ -46,19 +146,55 @@ class EnsembleSensitivityClassifier:
         "low": ["city", "country", "ville", "المدينة"]
     }
 
+    # Rule-layer keyword groups (Deterministic layer, below the regex checks)
+    RULE_KEYWORDS = {
+        "identity": ["cin", "passport", "identit", "national", "بطاقة", "la carte"],
+        "financial": ["iban", "rib", "banque", "bank", "salaire", "salary", "الحساب", "monétaire"],
+        # Medical keywords (Requested in Stress Test)
+        "medical": ["patient", "santé", "médic", "hôpital", "doctor", "fièvre", "toux", "maladie", "ordonnance"]
+    }
+
+    # Context hints used to map the semantic layer's score to a category
+    SEMANTIC_HINT_KEYWORDS = {
+        "fr_medical": ["patient", "fièvre", "toux", "médic"],
+        "ar_identity": ["هاتف", "خبر", "بطاقة"]
+    }
+
+    # Every keyword table flattened once at class load: a text is scanned in a
+    # single loop that yields a bitmask of the groups it hits.
+    _KEYWORD_TABLE, _GROUP_BITS = _build_keyword_table({
+        **{f"rule:{group}": kws for group, kws in RULE_KEYWORDS.items()},
+        **{f"level:{level}": kws for level, kws in SENSITIVITY_KEYWORDS.items()},
+        **{f"semantic:{hint}": kws for hint, kws in SEMANTIC_HINT_KEYWORDS.items()}
+    })
+    # Single O(len(text)) pass over all keywords at once (None without pyahocorasick)
+    _KEYWORD_AUTOMATON = _build_keyword_automaton(_KEYWORD_TABLE)
+
     # Regex patterns for Moroccan identifiers (Fuzzy support)
     ID_REGEX = {
-        "MOROCCAN_CIN": r"\b([A-Z]{1,2})[\s\.\-]*([0-9]{1,2})[\s\.\-]*([0-9]{2})[\s\.\-]*([0-9]{2})\b", # Flexible separators
+        "MOROCCAN_CIN": r"\b(?:[A-Z]{1,2})[\s\.\-]*(?:[0-9]{1,2})[\s\.\-]*(?:[0-9]{2})[\s\.\-]*(?:[0-9]{2})\b", # Flexible separators
         "MOROCCAN_PASSPORT": r"\b[A-Z][\s\.]*[0-9]{7}\b",
         "MOROCCAN_RIB": r"\b[0-9]{3}[\s\.]*[0-9]{3}[\s\.]*[0-9]{12}[\s\.]*[0-9]{2}[\s\.]*[0-9]{2}\b" # Fuzzy RIB
     }
 
+    # All ID_REGEX patterns fused into one alternation (compiled once at class
+    # load), so a text is scanned a single time. Alternation order = priority.
+    _ID_FUSED = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in ID_REGEX.items()))
+    _ID_PRIORITY = {name: rank for rank, name in enumerate(ID_REGEX)}
+
     def __init__(self, model_dir: str = "backend/models"):
         self.model_dir = model_dir
         self.vectorizer = None
         self.nb_model = None
         self.transformer_pipelines = {}
+        self._transformers_lock = threading.Lock()  # classify runs in worker threads
         self.is_trained = False
+        self._result_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._model_generation = 0  # bumped (under _cache_lock) on every model swap
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self.semantic_skips = 0  # transformer passes skipped on decisive rule hits
         
         self.load_models()
 
@@ -70,12 +206,20 @@ class EnsembleSensitivityClassifier:
             
             if os.path.exists(vec_path) and os.path.exists(model_path):
                 self.vectorizer = joblib.load(vec_path)
-                self.nb_model = joblib.load(model_path)
+                # NB weight arrays are memory-mapped read-only, not copied into RAM
+                self.nb_model = joblib.load(model_path, mmap_mode="r")
                 self.is_trained = True
                 print("✅ Statistical models loaded")
         except Exception as e:
             print(f"⚠️ Error loading statistical models: {e}")
 
+    @staticmethod
+    def _dump_atomic(obj, path: str):
+        """Write to a temp file then rename, never truncating a file that may be memory-mapped"""
+        tmp_path = f"{path}.tmp"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+
     def retrain_from_validated(self, data: List[Dict]):
         """
         Active Learning: Re-train the statistical baseline using human-validated data.
@@ -91,17 +235,23 @@ class EnsembleSensitivityClassifier:
             # 1. Update/Clean labels to match CATEGORY_LABELS
             valid_labels = [l if l in self.CATEGORY_LABELS else "OTHER" for l in labels]
             
-            # 2. Retrain Vectorizer & NB Model
-            self.vectorizer = TfidfVectorizer(ngram_range=(1, 2))
-            X = self.vectorizer.fit_transform(texts)
-            self.nb_model = MultinomialNB()
-            self.nb_model.fit(X, valid_labels)
+            # 2. Retrain Vectorizer & NB Model (off to the side, live models untouched)
+            vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+            X = vectorizer.fit_transform(texts)
+            nb_model = MultinomialNB()
+            nb_model.fit(X, valid_labels)
             
             # 3. Save updated models
-            joblib.dump(self.vectorizer, os.path.join(self.model_dir, "vectorizer.joblib"))
-            joblib.dump(self.nb_model, os.path.join(self.model_dir, "nb_model.joblib"))
+            self._dump_atomic(vectorizer, os.path.join(self.model_dir, "vectorizer.joblib"))
+            self._dump_atomic(nb_model, os.path.join(self.model_dir, "nb_model.joblib"))
             
-            self.is_trained = True
+            # 4. Swap both models and invalidate cached results in one step
+            with self._cache_lock:
+                self.vectorizer = vectorizer
+                self.nb_model = nb_model
+                self.is_trained = True
+                self._model_generation += 1
+                self._result_cache.clear()
             print(f"🚀 Active Learning: Model re-trained on {len(data)} validated samples.")
             return True
         except Exception as e:
@@ -113,10 +263,28 @@ class EnsembleSensitivityClassifier:
         if not TRANSFORMERS_AVAILABLE or lang in self.transformer_pipelines:
             return
 
+        with self._transformers_lock:
+            if lang not in self.transformer_pipelines:
+                self._load_transformer(lang)
+
+    def _load_transformer(self, lang: str):
+        """Load one language pipeline (caller holds _transformers_lock)"""
         # Local model path check
         local_path = os.path.join(self.model_dir, lang)
+        onnx_path = os.path.join(local_path, "onnx_int8")
         
         try:
+            if ORT_AVAILABLE and os.path.exists(os.path.join(onnx_path, ONNX_INT8_FILE)):
+                print(f"⚡ Loading INT8 ONNX model for {lang} from {onnx_path}")
+                self.transformer_pipelines[lang] = PipelineBatcher(pipeline(
+                    "text-classification",
+                    model=self._load_onnx_int8(onnx_path),
+                    tokenizer=AutoTokenizer.from_pretrained(onnx_path, use_fast=True),
+                    device=-1 # CPU
+                ))
+                print(f"✅ Transformer model for {lang} initialized (ONNX Runtime)")
+                return
+
             if os.path.exists(os.path.join(local_path, "config.json")):
                 model_name = local_path
                 print(f"🏠 Loading LOCAL transformer model for {lang} from {local_path}")
@@ -129,20 +297,124 @@ class EnsembleSensitivityClassifier:
                     model_name = "distilbert-base-uncased-finetuned-sst-2-english"
                 print(f"🌐 Downloading transformer model for {lang} ({model_name})")
             
-            self.transformer_pipelines[lang] = pipeline(
+            # Rust-backed tokenizer (converted from the slow one if needed)
+            tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+            if not tokenizer.is_fast:
+                print(f"⚠️ No fast tokenizer for {lang}, using the Python implementation")
+            
+            # Weights are loaded straight into the final tensors (no random init
+            # copy), safetensors checkpoints are memory-mapped when present
+            model = AutoModelForSequenceClassification.from_pretrained(model_name, low_cpu_mem_usage=True).eval()
+            self._limit_torch_threads()
+            clf_pipeline = pipeline(
                 "text-classification",
-                model=model_name,
-                tokenizer=model_name,
+                model=model,
+                tokenizer=tokenizer,
                 device=-1 # CPU
             )
+            clf_pipeline.model = self._quantize_for_cpu(clf_pipeline.model)
+            self.transformer_pipelines[lang] = PipelineBatcher(clf_pipeline)
             print(f"✅ Transformer model for {lang} initialized")
         except Exception as e:
             print(f"⚠️ Error initializing transformer for {lang}: {e}")
 
+    @staticmethod
+    def _load_onnx_int8(onnx_path: str):
+        """INT8 ONNX export (see download_models.py) served by ONNX Runtime on CPU"""
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+        return ORTModelForSequenceClassification.from_pretrained(
+            onnx_path,
+            file_name=ONNX_INT8_FILE,
+            session_options=sess_options,
+            provider="CPUExecutionProvider"
+        )
+
+    @staticmethod
+    def _limit_torch_threads():
+        """Cap intra-op threads so several uvicorn workers do not oversubscribe the cores"""
+        try:
+            import torch
+            torch.set_num_threads(TORCH_NUM_THREADS)
+        except Exception as e:
+            print(f"⚠️ Could not set torch threads: {e}")
+
+    @staticmethod
+    def _quantize_for_cpu(model):
+        """INT8 dynamic quantization of Linear layers (CPU inference only)"""
+        try:
+            import torch
+            return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            print(f"⚠️ INT8 quantization skipped, keeping FP32 model: {e}")
+            return model
+
+    def scan_keywords(self, text_lower: str) -> int:
+        """Bitmask of keyword groups found in an already-lowercased text"""
+        mask = 0
+        if self._KEYWORD_AUTOMATON is not None:
+            for _, bits in self._KEYWORD_AUTOMATON.iter(text_lower):
+                mask |= bits
+            return mask
+
+        for keyword, bit in self._KEYWORD_TABLE:
+            # Once a group has hit, its remaining keywords are skipped
+            if not mask & bit and keyword in text_lower:
+                mask |= bit
+        return mask
+
+    def keyword_sensitivity(self, mask: int) -> str:
+        """Highest sensitivity level whose keywords are in the scan mask"""
+        for level in self.SENSITIVITY_KEYWORDS:
+            if mask & self._GROUP_BITS[f"level:{level}"]:
+                return level
+        return "unknown"
+
+    def cache_info(self) -> Dict:
+        """Hit/miss counters of the classification result cache"""
+        with self._cache_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "size": len(self._result_cache),
+                "maxsize": RESULT_CACHE_MAXSIZE
+            }
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._model_generation += 1  # in-flight results are not written back
+            self._result_cache.clear()
+
     def classify(self, text: str, lang: str = "en") -> Dict:
         """
         Perform ensemble classification with explainability.
+        Repeated texts are answered from an LRU cache keyed by a digest of the text.
         """
+        key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), lang)
+        with self._cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+                self._cache_hits += 1
+                return copy.deepcopy(cached)
+            self._cache_misses += 1
+            # Consistent vectorizer/NB pair for this call, even if a retrain swaps them
+            generation = self._model_generation
+            vectorizer, nb_model = self.vectorizer, self.nb_model
+            is_trained = self.is_trained
+
+        result = self._classify_uncached(text, lang, vectorizer, nb_model, is_trained)
+
+        with self._cache_lock:
+            # Computed with models a retrain has since replaced: do not cache it
+            if generation == self._model_generation:
+                self._result_cache[key] = copy.deepcopy(result)
+                if len(self._result_cache) > RESULT_CACHE_MAXSIZE:
+                    self._result_cache.popitem(last=False)
+        return result
+
+    def _classify_uncached(self, text: str, lang: str, vectorizer, nb_model, is_trained: bool) -> Dict:
         text_lower = text.lower()
         
         # 1. Deterministic Layer (Triggers)
@@ -151,32 +423,37 @@ class EnsembleSensitivityClassifier:
         rule_label = "OTHER"
         
         # Regex Checks (Strong indicators)
-        for name, pattern in self.ID_REGEX.items():
-            if re.search(pattern, text):
-                triggers.append(f"Rules: Detected {name} via Regex")
-                rule_score = 0.95
-                rule_label = "PERSONAL_IDENTITY" if "CIN" in name or "PASSPORT" in name else "FINANCIAL_DATA"
-                break
+        # Highest-priority identifier found anywhere in the text wins
+        id_match = None
+        for match in self._ID_FUSED.finditer(text):
+            name = match.lastgroup
+            if id_match is None or self._ID_PRIORITY[name] < self._ID_PRIORITY[id_match]:
+                id_match = name
+                if self._ID_PRIORITY[name] == 0:
+                    break
+        
+        if id_match:
+            triggers.append(f"Rules: Detected {id_match} via Regex")
+            rule_score = 0.95
+            rule_label = "PERSONAL_IDENTITY" if "CIN" in id_match or "PASSPORT" in id_match else "FINANCIAL_DATA"
 
         # Keyword Checks
+        keyword_hits = self.scan_keywords(text_lower)
         if rule_score < 0.9:
             # Identity keywords
-            id_keys = ["cin", "passport", "identit", "national", "بطاقة", "la carte"]
-            if any(k in text_lower for k in id_keys):
+            if keyword_hits & self._GROUP_BITS["rule:identity"]:
                 triggers.append("Rules: Identity Keyword Detected")
                 rule_score = max(rule_score, 0.8)
                 rule_label = "PERSONAL_IDENTITY"
                 
             # Financial keywords
-            fin_keys = ["iban", "rib", "banque", "bank", "salaire", "salary", "الحساب", "monétaire"]
-            if any(k in text_lower for k in fin_keys):
+            if keyword_hits & self._GROUP_BITS["rule:financial"]:
                 triggers.append("Rules: Financial Keyword Detected")
                 rule_score = max(rule_score, 0.9)
                 rule_label = "FINANCIAL_DATA"
             
-            # Medical keywords (Requested in Stress Test)
-            med_keys = ["patient", "santé", "médic", "hôpital", "doctor", "fièvre", "toux", "maladie", "ordonnance"]
-            if any(k in text_lower for k in med_keys):
+            # Medical keywords
+            if keyword_hits & self._GROUP_BITS["rule:medical"]:
                 triggers.append("Rules: Medical Context Detected")
                 rule_score = max(rule_score, 0.85)
                 rule_label = "MEDICAL_DATA"
@@ -186,14 +463,15 @@ class EnsembleSensitivityClassifier:
         stat_top_label = "OTHER"
         stat_top_score = 0.0
         
-        if self.is_trained and self.vectorizer and self.nb_model:
+        if is_trained and vectorizer and nb_model:
             try:
-                vec_text = self.vectorizer.transform([text])
-                probs = self.nb_model.predict_proba(vec_text)[0]
-                classes = self.nb_model.classes_
-                stat_scores = {cls: float(prob) for cls, prob in zip(classes, probs)}
-                stat_top_label = max(stat_scores, key=stat_scores.get)
-                stat_top_score = stat_scores[stat_top_label]
+                vec_text = vectorizer.transform([text])
+                probs = nb_model.predict_proba(vec_text)[0]
+                classes = nb_model.classes_
+                top = int(np.argmax(probs))
+                stat_top_label = str(classes[top])
+                stat_top_score = float(probs[top])
+                stat_scores = dict(zip(classes.tolist(), probs.tolist()))
                 if stat_top_score > 0.6:
                     triggers.append(f"Statistical: High correlation with {stat_top_label}")
             except Exception:
@@ -202,21 +480,29 @@ class EnsembleSensitivityClassifier:
         # 3. Semantic Layer (Transformer)
         semantic_score = 0.0
         semantic_label = "OTHER"
-        if TRANSFORMERS_AVAILABLE:
+        semantic_skipped = rule_score > 0.8
+        if semantic_skipped:
+            # Decisive rule hit: the rule label overrides the ensemble below, so
+            # the label is unchanged. Confidence becomes max(weighted score without
+            # semantic, rule score) and is reported via "semantic_skipped".
+            triggers.append("Semantic: skipped (decisive rule match)")
+            with self._cache_lock:
+                self.semantic_skips += 1
+        elif TRANSFORMERS_AVAILABLE:
             if lang not in self.transformer_pipelines:
                 self.init_transformers(lang)
             
             if lang in self.transformer_pipelines:
                 try:
-                    result = self.transformer_pipelines[lang](text[:512])[0]
+                    result = self.transformer_pipelines[lang](text[:512])
                     # Map sentiment labels to categories if needed, or use as context
                     # For stress tests, let's treat high scores as positive context
                     semantic_score = float(result["score"])
                     
                     # Heuristic mapping for stress test (simulation)
-                    if lang == "fr" and any(k in text_lower for k in ["patient", "fièvre", "toux", "médic"]):
+                    if lang == "fr" and keyword_hits & self._GROUP_BITS["semantic:fr_medical"]:
                         semantic_label = "MEDICAL_DATA"
-                    elif lang == "ar" and any(k in text_lower for k in ["هاتف", "خبر", "بطاقة"]):
+                    elif lang == "ar" and keyword_hits & self._GROUP_BITS["semantic:ar_identity"]:
                         semantic_label = "PERSONAL_IDENTITY"
                     
                     if semantic_score > 0.8:
@@ -256,8 +542,11 @@ class EnsembleSensitivityClassifier:
             "classification": final_label,
             "confidence": round(float(final_confidence), 3),
             "language": lang,
+            # Sensitivity level from the same keyword scan (text lowercased once)
+            "keyword_sensitivity": self.keyword_sensitivity(keyword_hits),
             "explainability": {
                 "triggers": triggers,
+                "semantic_skipped": semantic_skipped,
                 "breakdown": {
                     "statistical": round(stat_top_score, 3),
                     "semantic": round(semantic_score, 3),
@@ -24,9 +24,30 @@ def download_models():
             tokenizer.save_pretrained(save_path)
             model.save_pretrained(save_path)
             print(f"✅ {lang} model saved successfully.")
+            export_onnx_int8(save_path)
         except Exception as e:
             print(f"❌ Error downloading {lang} model: {e}")
 
+def export_onnx_int8(save_path):
+    """Export a saved model to ONNX and quantize it to INT8 (picked up by the classifier at load)"""
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError:
+        print("⚠️ optimum[onnxruntime] not installed, skipping INT8 ONNX export")
+        return
+
+    onnx_path = os.path.join(save_path, "onnx_int8")
+    try:
+        ort_model = ORTModelForSequenceClassification.from_pretrained(save_path, export=True)
+        quantizer = ORTQuantizer.from_pretrained(ort_model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=onnx_path, quantization_config=qconfig)
+        AutoTokenizer.from_pretrained(save_path).save_pretrained(onnx_path)
+        print(f"✅ INT8 ONNX model exported to {onnx_path}")
+    except Exception as e:
+        print(f"❌ Error exporting INT8 ONNX model: {e}")
+
 if __name__ == "__main__":
     # Ensure we are in the right directory or absolute paths
     # Assuming run from services/classification-serv/
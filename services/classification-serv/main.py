@@ -10,10 +10,13 @@ According to Cahier des Charges:
 """
 import uvicorn
 import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional, Dict
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import os
 
@@ -34,7 +37,7 @@ try:
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
-from backend.models.ensemble_classifier import EnsembleSensitivityClassifier
+from backend.models.ensemble_classifier import EnsembleSensitivityClassifier, BATCH_MAX
 
 # ====================================================================
 # MODELS
@@ -65,6 +68,18 @@ class TrainRequest(BaseModel):
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "backend", "models")
 classifier = EnsembleSensitivityClassifier(model_dir=MODEL_PATH)
 
+# Dedicated pool for CPU-bound classifier calls, sized so a full transformer
+# micro-batch can form without competing with other to_thread work
+classifier_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CLASSIFIER_THREADS", str(BATCH_MAX))),
+    thread_name_prefix="classifier"
+)
+
+async def run_classifier(func, *args):
+    """Run a blocking classifier call on the dedicated pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(classifier_executor, func, *args)
+
 # ====================================================================
 # FASTAPI APP
 # ====================================================================
@@ -72,7 +87,8 @@ classifier = EnsembleSensitivityClassifier(model_dir=MODEL_PATH)
 app = FastAPI(
     title="Classification Service",
     description="Fine-Grained ML/NLP Classification (Mongo Persisted)",
-    version="1.1.0"
+    version="1.1.0",
+    default_response_class=ORJSONResponse
 )
 
 @app.middleware("http")
@@ -91,6 +107,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Languages whose transformer pipelines are loaded and exercised at startup
+WARMUP_LANGUAGES = [l.strip() for l in os.getenv("CLASSIFIER_WARMUP_LANGS", "en,fr,ar").split(",") if l.strip()]
+
+def warmup_classifier():
+    """Load pipelines and run one dummy pass per language (first-call costs)"""
+    for lang in WARMUP_LANGUAGES:
+        try:
+            classifier.classify(text="warmup", lang=lang)
+        except Exception as e:
+            print(f"⚠️ Warmup failed for {lang}: {e}")
+
+async def ensure_indexes():
+    """Create the indexes used by the validation workflow queries (idempotent)"""
+    try:
+        await db.pending_classifications.create_index([("created_at", -1)])
+        await db.pending_classifications.create_index("id")
+        await db.validated_classifications.create_index([("created_at", -1)])
+    except Exception as e:
+        print(f"⚠️ Index creation failed: {e}")
+
+@app.on_event("startup")
+async def startup_event():
+    if db is not None:
+        await ensure_indexes()
+    await asyncio.to_thread(warmup_classifier)
+
 @app.get("/")
 async def root():
     count = 0
@@ -112,21 +154,24 @@ def health():
         "models": {
             "sklearn": SKLEARN_AVAILABLE,
             "transformers": TRANSFORMERS_AVAILABLE
-        }
+        },
+        "semantic_skips": classifier.semantic_skips
     }
 
-@app.post("/classify", response_model=ClassifyResponse)
+@app.get("/cache/stats")
+def cache_stats():
+    """Classification result cache counters"""
+    return classifier.cache_info()
+
+@app.post("/classify", response_model=None, responses={200: {"model": ClassifyResponse}})
 async def classify_text(request: ClassifyRequest):
     """
     Advanced Ensemble Classification (Tâche 5)
     Combines Keywords, Multi-language BERT, and Statistical Models
     """
     try:
-        # 1. Run Ensemble Inference
-        result = classifier.classify(
-            text=request.text,
-            lang=request.language
-        )
+        # 1. Run Ensemble Inference (CPU-bound: keep it off the event loop)
+        result = await run_classifier(classifier.classify, request.text, request.language)
         
         # 2. Extract results
         top_category = result["classification"]
@@ -135,21 +180,16 @@ async def classify_text(request: ClassifyRequest):
         
         # 3. Determine Sensitivity based on logic + triggers
         sensitivity = "unknown"
-        text_lower = request.text.lower()
         
         # Priority 1: Direct Keyword/Regex/Medical triggers from classifier
-        triggers_str = str(explainability["triggers"])
-        if "Rules: " in triggers_str:
+        if any(t.startswith("Rules: ") for t in explainability["triggers"]):
             if top_category == "PERSONAL_IDENTITY": sensitivity = "critical"
             elif top_category == "FINANCIAL_DATA": sensitivity = "critical"
             elif top_category == "MEDICAL_DATA": sensitivity = "high"
             
         # Priority 2: Keyword scanning (Secondary backup)
         if sensitivity == "unknown":
-            for level, keywords in classifier.SENSITIVITY_KEYWORDS.items():
-                if any(kw in text_lower for kw in keywords):
-                    sensitivity = level
-                    break
+            sensitivity = result["keyword_sensitivity"]
         
         # Priority 3: Confidence-based elevation
         if sensitivity == "unknown" and confidence > 0.6:
@@ -158,16 +198,18 @@ async def classify_text(request: ClassifyRequest):
              elif top_category in ["MEDICAL_DATA"]:
                  sensitivity = "medium"
 
-        return ClassifyResponse(
-            success=True,
-            text=result["text_preview"],
-            classification=top_category,
-            sensitivity_level=sensitivity,
-            confidence=confidence,
-            model_used=request.model,
-            explainability=explainability,
-            categories=result["raw_scores"]["statistical"] if result["raw_scores"]["statistical"] else {top_category: confidence}
-        )
+        # Returned as a ready Response: skips response_model validation and
+        # jsonable_encoder, the payload is built from plain str/float/dict values
+        return ORJSONResponse({
+            "success": True,
+            "text": result["text_preview"],
+            "classification": top_category,
+            "sensitivity_level": sensitivity,
+            "confidence": confidence,
+            "model_used": request.model,
+            "explainability": explainability,
+            "categories": result["raw_scores"]["statistical"] if result["raw_scores"]["statistical"] else {top_category: confidence}
+        })
     except Exception as e:
         import traceback
         print(traceback.format_exc())
@@ -189,12 +231,8 @@ def get_categories():
 async def get_pending_classifications():
     """Get classifications awaiting human validation"""
     if db is not None:
-        cursor = db.pending_classifications.find().limit(50)
-        # Convert _id to string if needed, or exclude it
-        classifications = []
-        async for doc in cursor:
-             doc["_id"] = str(doc["_id"])
-             classifications.append(doc)
+        # Documents are addressed by their own "id", _id is excluded server-side
+        classifications = await db.pending_classifications.find({}, {"_id": 0}).limit(50).to_list(50)
     else:
         classifications = []
         
@@ -235,7 +273,7 @@ async def validate_classification(classification_id: str, action: str = "confirm
 @app.post("/add-pending")
 async def add_pending_classification(request: ClassifyRequest):
     """Classify and add to pending queue for validation"""
-    result = classifier.classify(text=request.text, lang=request.language)
+    result = await run_classifier(classifier.classify, request.text, request.language)
     
     classification_id = str(uuid.uuid4())
     classification_data = {
@@ -246,10 +284,8 @@ async def add_pending_classification(request: ClassifyRequest):
     }
     
     if db is not None:
+        # Awaited: the id is only returned once /validate can find it
         await db.pending_classifications.insert_one(classification_data)
-        # Remove _id from response
-        if "_id" in classification_data:
-            del classification_data["_id"]
     
     return {
         "success": True,
@@ -277,7 +313,7 @@ async def retrain_model():
              return {"success": False, "message": "No validated data found to retrain"}
 
         # 2. Trigger retraining
-        success = classifier.retrain_from_validated(validated_data)
+        success = await run_classifier(classifier.retrain_from_validated, validated_data)
         
         return {
             "success": success,
@@ -291,11 +327,7 @@ async def retrain_model():
 async def get_validated():
     """Get validated classifications"""
     if db is not None:
-        cursor = db.validated_classifications.find().sort("created_at", -1).limit(50)
-        validated = []
-        async for doc in cursor:
-             doc["_id"] = str(doc["_id"])
-             validated.append(doc)
+        validated = await db.validated_classifications.find({}, {"_id": 0}).sort("created_at", -1).limit(50).to_list(50)
     else:
         validated = []
         
@@ -308,4 +340,15 @@ if __name__ == "__main__":
     print(f"\\n" + "="*60)
     print(f"🧠 CLASSIFICATION SERVICE (MONGO) - Tâche 5")
     print(f"="*60)
-    uvicorn.run("main:app", host="0.0.0.0", port=8005, reload=True)
+    # Single worker by default: the classifier, its result cache and /retrain
+    # model swaps live in-process, so extra workers would serve stale models
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8005,
+        workers=int(os.getenv("WORKERS", "1")),
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=30,
+        log_level="warning"
+    )
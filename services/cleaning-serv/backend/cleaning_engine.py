@@ -1,8 +1,26 @@
+import os
 import pandas as pd
 import numpy as np
-from ydata_profiling import ProfileReport
+from jinja2 import Template
 import re
 
+# Frames smaller than this get a describe()/missing-rate page instead of a
+# ydata-profiling run (its import and per-column analysis cost seconds)
+LIGHT_PROFILE_MAX_ROWS = int(os.getenv("LIGHT_PROFILE_MAX_ROWS", "1000"))
+
+LIGHT_REPORT_TEMPLATE = Template("""<html>
+<head><title>{{ title }}</title></head>
+<body>
+    <h1>{{ title }}</h1>
+    <p>{{ stats.n_rows }} rows, {{ stats.n_cols }} columns, {{ stats.duplicates }} duplicate rows,
+       {{ stats.missing_cells }} missing cells ({{ stats.missing_percentage }}%), {{ stats.memory_size }}</p>
+    <h2>Summary statistics</h2>
+    {{ describe_html }}
+    <h2>Missing rate per column</h2>
+    {{ missing_html }}
+</body>
+</html>""")
+
 def clean_dataframe(df: pd.DataFrame, config: dict = None) -> (pd.DataFrame, dict):
     """
     Implements the Data Cleaning Pipeline as per CDC Section 6.4.
@@ -37,13 +55,17 @@ def clean_dataframe(df: pd.DataFrame, config: dict = None) -> (pd.DataFrame, dic
     if missing_strategy == "drop":
         df = df.dropna(how='any')
     elif missing_strategy == "mean":
-        numeric_cols = df.select_dtypes(include=np.number).columns
-        for col in numeric_cols:
-            if df[col].isnull().any():
-                df[col] = df[col].fillna(df[col].mean())
-        for col in df.select_dtypes(exclude=np.number).columns:
-             if not df[col].empty and df[col].isnull().any():
-                df[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else "")
+        # One reduction per dtype block, one fillna for the whole frame
+        fill_values = df.select_dtypes(include=np.number).mean().to_dict()
+        others = df.select_dtypes(exclude=np.number)
+        others = others.loc[:, others.isnull().any()]
+        if not others.empty:
+            modes = others.mode()
+            first_modes = modes.iloc[0] if len(modes) else pd.Series(dtype=object)
+            for col in others.columns:
+                mode_value = first_modes.get(col)
+                fill_values[col] = "" if pd.isna(mode_value) else mode_value
+        df = df.fillna(fill_values)
     
     final_missing = df.isnull().sum().sum()
     metrics["steps"].append({"step": "missing_values", "corrected": int(initial_missing - final_missing)})
@@ -55,16 +77,21 @@ def clean_dataframe(df: pd.DataFrame, config: dict = None) -> (pd.DataFrame, dic
     numeric_cols = df.select_dtypes(include=np.number).columns
     total_outliers_removed = 0
     
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
+    # Nothing to bound on an empty frame (e.g. "drop" removed every row)
+    if len(df) > 0 and len(numeric_cols) > 0:
+        # Bounds for every numeric column in one pass, then a single row filter
+        values = df[numeric_cols].to_numpy(dtype=float, na_value=np.nan)
+        # np.nanquantile falls back to a per-column Python loop; only pay it when NaNs exist
+        quantile = np.nanquantile if np.isnan(values).any() else np.quantile
+        Q1, Q3 = quantile(values, [0.25, 0.75], axis=0)
         IQR = Q3 - Q1
         lower_bound = Q1 - (outlier_multiplier * IQR)
         upper_bound = Q3 + (outlier_multiplier * IQR)
         
-        original_len = len(df)
-        df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-        total_outliers_removed += (original_len - len(df))
+        # NaN compares False, so rows with missing numerics are dropped as before
+        keep = ((values >= lower_bound) & (values <= upper_bound)).all(axis=1)
+        total_outliers_removed = int(len(df) - keep.sum())
+        df = df[keep]
             
     metrics["steps"].append({"step": "outliers", "removed": total_outliers_removed})
 
@@ -105,10 +132,48 @@ def clean_dataframe(df: pd.DataFrame, config: dict = None) -> (pd.DataFrame, dic
     
     return df, metrics
 
+class LightProfileReport:
+    """Small-frame stand-in for ProfileReport (only to_file is used by the service)"""
+
+    def __init__(self, df: pd.DataFrame, stats: dict, title: str):
+        try:
+            describe_html = df.describe().to_html()
+        except ValueError:  # no columns to describe
+            describe_html = ""
+        self.html = LIGHT_REPORT_TEMPLATE.render(
+            title=title,
+            stats=stats,
+            describe_html=describe_html,
+            missing_html=df.isnull().mean().round(4).to_frame("missing_rate").to_html()
+        )
+
+    def to_file(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.html)
+
+def generate_light_profile(df: pd.DataFrame) -> (LightProfileReport, dict):
+    """Same summary keys as generate_profile, computed directly with pandas"""
+    n_cells = df.size
+    missing_cells = int(df.isnull().sum().sum())
+    stats = {
+        "n_rows": len(df),
+        "n_cols": len(df.columns),
+        "duplicates": int(df.duplicated().sum()),
+        "missing_cells": missing_cells,
+        "missing_percentage": round(missing_cells / n_cells * 100, 2) if n_cells else 0.0,
+        "memory_size": f"{df.memory_usage(deep=True).sum() / 1024:.2f} KB"
+    }
+    return LightProfileReport(df, stats, title="Data Profiling Report"), stats
+
 def generate_profile(df: pd.DataFrame) -> (dict, dict):
     """
     Generates a ydata-profiling report and returns metadata summary.
     """
+    if len(df) < LIGHT_PROFILE_MAX_ROWS:
+        return generate_light_profile(df)
+
+    from ydata_profiling import ProfileReport
+
     # minimal=True for performance as per KPI < 5s
     profile = ProfileReport(df, title="Data Profiling Report", minimal=True)
     description = profile.get_description()
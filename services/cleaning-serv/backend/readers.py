@@ -0,0 +1,60 @@
+import os
+import pandas as pd
+
+# Arrow parses CSV in blocks of this size, in parallel across cores
+CSV_BLOCK_SIZE = int(os.getenv("CSV_BLOCK_SIZE", str(8 << 20)))
+
+# pandas' default na_values, so Arrow marks the same tokens as missing
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null"
+]
+CSV_TRUE_VALUES = ["True", "TRUE", "true"]
+CSV_FALSE_VALUES = ["False", "FALSE", "false"]
+
+
+def read_csv(source) -> pd.DataFrame:
+    """Parse CSV with the multi-threaded Arrow reader, C engine for files it rejects"""
+    try:
+        return _read_csv_arrow(source)
+    except Exception as e:
+        print(f"⚠️ pyarrow CSV parse failed, falling back to C engine: {e}")
+        source.seek(0)
+        return pd.read_csv(source)
+
+
+def _read_csv_arrow(source) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True)
+    convert_options = pacsv.ConvertOptions(
+        null_values=CSV_NULL_VALUES,
+        strings_can_be_null=True,
+        true_values=CSV_TRUE_VALUES,
+        false_values=CSV_FALSE_VALUES
+    )
+
+    # Arrow infers date/time/timestamp columns from ISO-looking text where
+    # pd.read_csv keeps strings: infer on the first block, then pin those as strings
+    head = source.read(CSV_BLOCK_SIZE)
+    source.seek(0)
+    if len(head) == CSV_BLOCK_SIZE:
+        head = head[:head.rfind(b"\n") + 1]
+    schema = pacsv.read_csv(pa.py_buffer(head), convert_options=convert_options).schema
+    temporal = {field.name: pa.string() for field in schema if pa.types.is_temporal(field.type)}
+    if temporal:
+        convert_options.column_types = temporal
+
+    return pacsv.read_csv(source, read_options=read_options, convert_options=convert_options).to_pandas()
+
+
+def read_excel(source) -> pd.DataFrame:
+    """Parse Excel with the Rust calamine reader, openpyxl when it is missing or fails"""
+    try:
+        return pd.read_excel(source, engine="calamine")
+    except Exception as e:
+        print(f"⚠️ calamine Excel parse failed, falling back to openpyxl: {e}")
+        source.seek(0)
+        return pd.read_excel(source)
@@ -28,6 +28,7 @@ async def save_raw_dataset(dataset_id: str, df, filename: str = None):
     document = {
         "dataset_id": dataset_id,
         "filename": filename or "unknown_file",
+        "rows": len(df),  # read by /stats without unpacking "data"
         "data": df.to_dict(orient="records"),
         "created_at": datetime.utcnow()
     }
@@ -90,7 +91,7 @@ async def log_audit_event(service: str, action: str, user: str, status: str, det
         "action": action,
         "user": user,
         "status": status,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
         "details": details or {}
     }
     await audit_logs_col.insert_one(document)
@@ -1,10 +1,14 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+import orjson
 import pandas as pd
-import io
+import asyncio
 import uuid
+from collections import OrderedDict
 
 from backend.cleaning_engine import clean_dataframe, generate_profile
+from backend.readers import read_csv, read_excel
 from backend.storage import (
     save_raw_dataset,
     load_raw_dataset,
@@ -49,7 +53,7 @@ except Exception as e:
 # =======================================================
 # RANGER INTEGRATION - Per Cahier des Charges Section 3.6
 # =======================================================
-import requests as ranger_requests
+import httpx
 import os
 
 # Configuration via environment variables for flexibility
@@ -57,12 +61,19 @@ RANGER_URL = os.getenv("RANGER_URL", "http://localhost:6080")
 RANGER_AUTH = (os.getenv("RANGER_USER", "admin"), os.getenv("RANGER_PASS", "hortonworks1"))
 RANGER_BYPASS = os.getenv("RANGER_BYPASS", "false").lower() == "true"
 
+# Async keep-alive pool shared by outbound calls (Ranger, Airflow, Classification),
+# so waiting on those services never blocks the event loop
+http_client = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=20)
+)
+
 class AccessDecision:
     ALLOWED = "allowed"
     DENIED = "denied"
     MASKED = "masked"
 
-def check_ranger_permission(username: str, resource_tag: str = "PII"):
+async def check_ranger_permission(username: str, resource_tag: str = "PII"):
     """
     Check Ranger for user permission on tagged resources.
     Per Cahier des Charges: FastAPI → Ranger REST API
@@ -74,7 +85,7 @@ def check_ranger_permission(username: str, resource_tag: str = "PII"):
 
     try:
         # Direct Ranger API call - most reliable method
-        resp = ranger_requests.get(
+        resp = await http_client.get(
             f"{RANGER_URL}/service/plugins/policies",
             params={"serviceName": "data_gov_tags"},
             auth=RANGER_AUTH,
@@ -133,6 +144,11 @@ def check_ranger_permission(username: str, resource_tag: str = "PII"):
 
 app = FastAPI(title="Cleaning Service", version="2.0")
 
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.aclose()
+
+
 @app.middleware("http")
 async def set_root_path(request: Request, call_next):
     root_path = request.headers.get("x-forwarded-prefix")
@@ -155,8 +171,22 @@ from fastapi.staticfiles import StaticFiles
 os.makedirs("static/reports", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# In-memory cache for quick access (MongoDB is primary storage)
-datasets_cache = {}
+# In-memory LRU of recently used frames (MongoDB is primary storage). Evicted
+# frames are reloaded from the Feather store below.
+DATASETS_CACHE_MAXSIZE = int(os.getenv("DATASETS_CACHE_SIZE", "16"))
+datasets_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+# Shape/filename per dataset, so info endpoints never need the frame itself
+datasets_meta = {}
+
+# Profiling metrics per dataset: {dataset_id: (version, metrics)}. Every
+# upload/clean/reload gives the cached frame a new "version".
+profile_cache = {}
+
+# Feather (Arrow IPC) copies of uploaded/cleaned frames: reloading one is a
+# columnar read instead of rebuilding a DataFrame from Mongo records
+DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR", "/tmp/cleaning_datasets")
+os.makedirs(DATASET_STORE_DIR, exist_ok=True)
 
 # Access log for audit trail
 access_log = []
@@ -201,7 +231,7 @@ async def get_user_permissions(username: str = Query(...), role: str = Query(def
     from datetime import datetime
     
     # Check "PII" tag permission
-    ranger_check = check_ranger_permission(username, "PII")
+    ranger_check = await check_ranger_permission(username, "PII")
     
     print(f"🔒 Ranger Permission Check for {username}: {ranger_check}")
     
@@ -213,8 +243,10 @@ async def get_user_permissions(username: str = Query(...), role: str = Query(def
     }
 
     # Check PII permission
-    pii_permission = check_ranger_permission(username, "PII")
-    spi_permission = check_ranger_permission(username, "SPI")
+    pii_permission, spi_permission = await asyncio.gather(
+        check_ranger_permission(username, "PII"),
+        check_ranger_permission(username, "SPI")
+    )
     
     # Determine access level
     pii_decision = pii_permission.get("decision", AccessDecision.DENIED)
@@ -272,51 +304,39 @@ async def get_access_log(limit: int = Query(default=50)):
 # Upload dataset (supports CSV, Excel, JSON)
 # --------------------------------------------------
 @app.post("/upload")
-async def upload_dataset(file: UploadFile = File(...)):
-    contents = await file.read()
+async def upload_dataset(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     filename = file.filename.lower()
     
     try:
-        if filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        elif filename.endswith('.xlsx') or filename.endswith('.xls'):
-            df = pd.read_excel(io.BytesIO(contents))
-        elif filename.endswith('.json'):
-            df = pd.read_json(io.BytesIO(contents))
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Use CSV, Excel, or JSON.")
+        # Parsed straight from the spooled upload file (kept on disk past 1 MB),
+        # in a worker thread so the event loop keeps serving
+        df = await asyncio.to_thread(_parse_upload, file.file, filename)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid file: {str(e)}")
 
     dataset_id = str(uuid.uuid4())
     
     # Cache for quick access
-    datasets_cache[dataset_id] = {
+    _cache_dataset(dataset_id, {
         "df": df,
-        "filename": file.filename
-    }
+        "filename": file.filename,
+        "version": uuid.uuid4().hex
+    })
+    _record_meta(dataset_id, df, file.filename)
     
-    # Try to save to MongoDB (non-blocking if fails)
-    try:
-        await save_raw_dataset(dataset_id, df, filename=file.filename)
-    except Exception as e:
-        print(f"MongoDB save warning: {e}")
+    # Disk store, MongoDB and Atlas are independent: run them concurrently
+    _, _, atlas_guid = await asyncio.gather(
+        asyncio.to_thread(_store_dataframe, dataset_id, df),
+        _save_raw_dataset(dataset_id, df, file.filename),
+        _register_atlas_dataset(dataset_id, file.filename)
+    )
     
-    # Register in Atlas and get GUID for later classification
-    atlas_guid = None
-    if atlas_client:
-        try:
-            atlas_guid = atlas_client.register_dataset_and_get_guid(
-                name=file.filename,
-                description=f"Uploaded dataset {file.filename}",
-                owner="admin", # TODO: Get from token
-                file_path=f"mongodb://datasets/{dataset_id}"
-            )
-        except Exception as e:
-            print(f"⚠️ Atlas registration failed: {e}")
+    # The DAG reads the saved rows and the Atlas entity: trigger it only once both exist
+    await _trigger_airflow_upload(dataset_id, file.filename)
     
-    # Log audit event for dataset upload
-    await log_audit_event(
+    # Log audit event for dataset upload (written after the response is sent)
+    background_tasks.add_task(
+        log_audit_event,
         service="CLEANING",
         action="DATASET_UPLOAD",
         user="admin",  # TODO: Get from token
@@ -328,25 +348,6 @@ async def upload_dataset(file: UploadFile = File(...)):
             "columns": len(df.columns)
         }
     )
-    
-    # -------------------------------------------------------------------------
-    # TRIGGER AIRFLOW DAG (Critical Fix)
-    # -------------------------------------------------------------------------
-    try:
-        import requests
-        print(f"🚀 Triggering Airflow DAG for {file.filename}...")
-        airflow_url = "http://airflow:8080/api/v1/dags/data_processing_pipeline/dagRuns"
-        response = requests.post(
-            airflow_url,
-            json={"conf": {"dataset_id": dataset_id, "filename": file.filename}},
-            auth=("admin", "admin")
-        )
-        if response.status_code == 200:
-            print("✅ Airflow DAG triggered successfully")
-        else:
-            print(f"⚠️ Airflow Trigger Failed: {response.status_code} - {response.text}")
-    except Exception as e:
-        print(f"⚠️ Could not trigger Airflow: {e}")
 
     return {
         "dataset_id": dataset_id,
@@ -364,12 +365,12 @@ async def upload_dataset(file: UploadFile = File(...)):
 # --------------------------------------------------
 @app.get("/datasets/{dataset_id}")
 async def get_dataset_info(dataset_id: str):
-    df = await _get_dataframe(dataset_id)
+    meta = await _get_meta(dataset_id)
     return {
         "dataset_id": dataset_id,
-        "rows": len(df),
-        "columns": len(df.columns),
-        "column_names": list(df.columns)
+        "rows": meta["rows"],
+        "columns": meta["columns"],
+        "column_names": meta["column_names"]
     }
 
 
@@ -380,18 +381,12 @@ async def get_dataset_info(dataset_id: str):
 async def get_dataset_full(dataset_id: str):
     """Return full dataset records for quality evaluation"""
     df = await _get_dataframe(dataset_id)
-    # Get metadata for filename
-    metadata = await load_raw_dataset(dataset_id)
-    filename = "unknown"
-    if metadata and "filename" in str(metadata):
-        filename = dataset_id  # Fallback to ID
+    filename = datasets_meta.get(dataset_id, {}).get("filename") or "unknown"
     
-    return {
-        "data": df.fillna("").to_dict(orient="records"),
-        "filename": filename,
-        "rows": len(df),
-        "columns": len(df.columns)
-    }
+    # Full exports are large: serialize once with orjson (off the event loop)
+    # instead of FastAPI's jsonable_encoder walk over every record
+    payload = await asyncio.to_thread(_dump_records, df, filename)
+    return Response(content=payload, media_type="application/json")
 
 
 # --------------------------------------------------
@@ -418,14 +413,25 @@ async def profile(dataset_id: str):
     Usage: GET /profile/{dataset_id}
     """
     df = await _get_dataframe(dataset_id)
+    version = datasets_cache.get(dataset_id, {}).get("version")
+    
+    report_dir = "static/reports"
+    report_path = f"{report_dir}/profile_{dataset_id}.html"
+    
+    # Same frame already profiled: reuse metrics and the HTML report on disk
+    cached = profile_cache.get(dataset_id)
+    if cached and cached[0] == version and os.path.exists(report_path):
+        return {
+            "dataset_id": dataset_id,
+            "metrics": cached[1],
+            "report_url": cached[1]["report_url"]
+        }
     
     # Generate profile using the new engine
     profile_report, metrics = generate_profile(df)
     
     # Save the HTML report to a local static folder for viewing
-    report_dir = "static/reports"
     os.makedirs(report_dir, exist_ok=True)
-    report_path = f"{report_dir}/profile_{dataset_id}.html"
     profile_report.to_file(report_path)
     
     # Save metadata to MongoDB
@@ -435,6 +441,7 @@ async def profile(dataset_id: str):
     except Exception as e:
         print(f"⚠️ Metadata save failed: {e}")
     
+    profile_cache[dataset_id] = (version, metrics)
     return {
         "dataset_id": dataset_id,
         "metrics": metrics,
@@ -533,10 +540,13 @@ async def get_cleaning_summary(dataset_id: str):
 async def get_stats():
     """Get aggregate statistics for the dashboard"""
     try:
-        total_datasets = await raw_datasets_col.count_documents({})
-        # Simple heuristic: total records count
-        # For performance, in a real app we'd use a metadata counter
-        pipeline = [{"$project": {"count": {"$size": "$data"}}}, {"$group": {"_id": None, "total": {"$sum": "$count"}}}]
+        total_datasets = await raw_datasets_col.estimated_document_count()
+        # Row counts are stored at upload; older documents fall back to $size
+        pipeline = [
+            {"$group": {"_id": None, "total": {"$sum": {
+                "$cond": [{"$isNumber": "$rows"}, "$rows", {"$size": {"$ifNull": ["$data", []]}}]
+            }}}}
+        ]
         cursor = raw_datasets_col.aggregate(pipeline)
         result = await cursor.to_list(length=1)
         total_records = result[0]["total"] if result else 0
@@ -557,7 +567,7 @@ async def list_datasets(limit: int = Query(default=10, le=100), username: str =
     RANGER INTEGRATION: Checks user permission before returning data.
     """
     # Check Ranger permission before returning sensitive data
-    permission = check_ranger_permission(username, "PII")
+    permission = await check_ranger_permission(username, "PII")
     
     if permission.get("decision") == AccessDecision.DENIED:
         raise HTTPException(
@@ -600,6 +610,10 @@ async def delete_dataset(dataset_id: str):
         # Remove from cache if present
         if dataset_id in datasets_cache:
             del datasets_cache[dataset_id]
+        datasets_meta.pop(dataset_id, None)
+        profile_cache.pop(dataset_id, None)
+        if os.path.exists(_store_path(dataset_id)):
+            os.remove(_store_path(dataset_id))
         
         if result.deleted_count > 0:
             return {"success": True, "message": f"Dataset {dataset_id} deleted successfully"}
@@ -637,10 +651,13 @@ async def clean(dataset_id: str, config: dict = None):
     metrics["cdc_compliant"] = len(kpi_warnings) == 0
     
     # Update cache
-    datasets_cache[dataset_id] = {
+    _cache_dataset(dataset_id, {
         "df": clean_df,
-        "filename": datasets_cache.get(dataset_id, {}).get("filename", "cleaned")
-    }
+        "filename": datasets_cache.get(dataset_id, {}).get("filename", "cleaned"),
+        "version": uuid.uuid4().hex
+    })
+    _record_meta(dataset_id, clean_df, datasets_meta.get(dataset_id, {}).get("filename"))
+    await asyncio.to_thread(_store_dataframe, dataset_id, clean_df)
     
     try:
         await save_clean_dataset(dataset_id, clean_df)
@@ -744,12 +761,11 @@ async def trigger_pipeline(request: PipelineTriggerRequest):
         # Airflow Integration (As requested by User)
         # ---------------------------------------------------------
         try:
-            import requests
             airflow_url = os.getenv("AIRFLOW_URL", "http://airflow:8080")
             dag_id = "data_processing_pipeline"
             
             # Trigger DAG run
-            response = requests.post(
+            response = await http_client.post(
                 f"{airflow_url}/api/v1/dags/{dag_id}/dagRuns",
                 json={"conf": {"dataset_id": request.dataset_id}},
                 auth=("admin", "admin"), # Default credentials
@@ -794,7 +810,7 @@ async def trigger_pipeline(request: PipelineTriggerRequest):
 
             # Call Classification Service
             cls_url = os.getenv("CLASSIFICATION_SERVICE_URL", "http://classification-service:8005")
-            cls_resp = requests.post(f"{cls_url}/classify", json={
+            cls_resp = await http_client.post(f"{cls_url}/classify", json={
                 "text": sample_text,
                 "language": "fr", # Default to FR context
                 "use_ml": True
@@ -899,17 +915,139 @@ async def health():
 # --------------------------------------------------
 # Helper function
 # --------------------------------------------------
+def _parse_upload(source, filename: str) -> pd.DataFrame:
+    if filename.endswith('.csv'):
+        return read_csv(source)
+    elif filename.endswith('.xlsx') or filename.endswith('.xls'):
+        return read_excel(source)
+    elif filename.endswith('.json'):
+        return pd.read_json(source)
+    raise HTTPException(status_code=400, detail="Unsupported file format. Use CSV, Excel, or JSON.")
+
+
+async def _save_raw_dataset(dataset_id: str, df: pd.DataFrame, filename: str):
+    # Non-blocking if MongoDB is unavailable
+    try:
+        await save_raw_dataset(dataset_id, df, filename=filename)
+    except Exception as e:
+        print(f"MongoDB save warning: {e}")
+
+
+async def _register_atlas_dataset(dataset_id: str, filename: str):
+    """Register in Atlas and return the GUID used later for classification"""
+    if not atlas_client:
+        return None
+    try:
+        return await asyncio.to_thread(
+            atlas_client.register_dataset_and_get_guid,
+            name=filename,
+            description=f"Uploaded dataset {filename}",
+            owner="admin", # TODO: Get from token
+            file_path=f"mongodb://datasets/{dataset_id}"
+        )
+    except Exception as e:
+        print(f"⚠️ Atlas registration failed: {e}")
+        return None
+
+
+async def _trigger_airflow_upload(dataset_id: str, filename: str):
+    try:
+        print(f"🚀 Triggering Airflow DAG for {filename}...")
+        airflow_url = "http://airflow:8080/api/v1/dags/data_processing_pipeline/dagRuns"
+        response = await http_client.post(
+            airflow_url,
+            json={"conf": {"dataset_id": dataset_id, "filename": filename}},
+            auth=("admin", "admin")
+        )
+        if response.status_code == 200:
+            print("✅ Airflow DAG triggered successfully")
+        else:
+            print(f"⚠️ Airflow Trigger Failed: {response.status_code} - {response.text}")
+    except Exception as e:
+        print(f"⚠️ Could not trigger Airflow: {e}")
+
+
+def _cache_dataset(dataset_id: str, entry: dict):
+    datasets_cache[dataset_id] = entry
+    datasets_cache.move_to_end(dataset_id)
+    while len(datasets_cache) > DATASETS_CACHE_MAXSIZE:
+        datasets_cache.popitem(last=False)
+
+
+def _json_default(obj):
+    # pd.Timestamp and other datetime subclasses are not native to orjson
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _dump_records(df: pd.DataFrame, filename: str) -> bytes:
+    return orjson.dumps(
+        {
+            "data": df.fillna("").to_dict(orient="records"),
+            "filename": filename,
+            "rows": len(df),
+            "columns": len(df.columns)
+        },
+        default=_json_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _record_meta(dataset_id: str, df: pd.DataFrame, filename: str = None) -> dict:
+    meta = {
+        "filename": filename,
+        "rows": len(df),
+        "columns": len(df.columns),
+        "column_names": list(df.columns)
+    }
+    datasets_meta[dataset_id] = meta
+    return meta
+
+
+async def _get_meta(dataset_id: str) -> dict:
+    meta = datasets_meta.get(dataset_id)
+    if meta is None:
+        # Unknown to this process (e.g. after a restart): derive it once from the frame
+        df = await _get_dataframe(dataset_id)
+        meta = _record_meta(dataset_id, df)
+    return meta
+
+
+def _store_path(dataset_id: str) -> str:
+    return os.path.join(DATASET_STORE_DIR, f"{os.path.basename(dataset_id)}.feather")
+
+
+def _store_dataframe(dataset_id: str, df: pd.DataFrame):
+    """Write the frame to the Feather store (skipped for frames Arrow cannot encode)"""
+    path = _store_path(dataset_id)
+    try:
+        # Temp file + rename: a failed write never leaves a truncated frame behind
+        df.reset_index(drop=True).to_feather(f"{path}.tmp", compression="lz4")
+        os.replace(f"{path}.tmp", path)
+    except Exception as e:
+        print(f"⚠️ Feather store skipped for {dataset_id}: {e}")
+
+
 async def _get_dataframe(dataset_id: str) -> pd.DataFrame:
     # Check cache first
     if dataset_id in datasets_cache:
+        datasets_cache.move_to_end(dataset_id)
         return datasets_cache[dataset_id]["df"]
     
+    # Then the local Feather store
+    store_path = _store_path(dataset_id)
+    if os.path.exists(store_path):
+        df = await asyncio.to_thread(pd.read_feather, store_path)
+        _cache_dataset(dataset_id, {"df": df, "filename": "from_store", "version": uuid.uuid4().hex})
+        return df
+    
     # Try MongoDB
     try:
         data = await load_raw_dataset(dataset_id)
         if data:
             df = pd.DataFrame(data)
-            datasets_cache[dataset_id] = {"df": df, "filename": "from_db"}
+            _cache_dataset(dataset_id, {"df": df, "filename": "from_db", "version": uuid.uuid4().hex})
             return df
     except:
         pass
@@ -58,5 +58,23 @@ def test_pipeline():
 
     print("\n✅ Verification Successful!")
 
+def test_outliers_on_empty_frame():
+    # Every row has a missing value, so the default "drop" strategy empties the frame
+    df = pd.DataFrame({
+        "id": [1, 2, 3],
+        "val": [10.0, None, 30.0],
+        "cat": ["a", "b", None]
+    })
+    
+    clean_df, metrics = clean_dataframe(df, {"missing_strategy": "drop"})
+    
+    assert len(clean_df) == 0, "All rows should be dropped"
+    assert list(clean_df.columns) == ["id", "val", "cat"]
+    outliers = next(s for s in metrics["steps"] if s["step"] == "outliers")
+    assert outliers["removed"] == 0
+
+    print("\n✅ Empty-frame outlier step OK")
+
 if __name__ == "__main__":
     test_pipeline()
+    test_outliers_on_empty_frame()
@@ -0,0 +1,35 @@
+import sys
+import os
+import io
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from backend.readers import read_csv
+
+CSV_DATA = b"""id,signup_date,last_seen,score,active,city
+1,2024-01-15,2024-01-15 10:30:00,12.5,true,Rabat
+2,2023-12-01,2023-12-01 08:00:00,NA,false,
+3,2022-06-30,2022-06-30 23:59:59,7.0,True,Casablanca
+"""
+
+def test_read_csv_matches_pandas_dtypes():
+    df = read_csv(io.BytesIO(CSV_DATA))
+    expected = pd.read_csv(io.BytesIO(CSV_DATA))
+
+    print("--- Arrow reader ---")
+    print(df.dtypes)
+
+    # Date-like text stays text, as with pd.read_csv
+    assert df["signup_date"].dtype == object, "Dates must not be parsed to timestamps"
+    assert df["last_seen"].dtype == object, "Timestamps must not be parsed"
+    assert df["signup_date"].tolist() == ["2024-01-15", "2023-12-01", "2022-06-30"]
+
+    # Same dtypes and the same missing cells as the C engine
+    assert df.dtypes.astype(str).to_dict() == expected.dtypes.astype(str).to_dict()
+    assert df.isnull().equals(expected.isnull()), "NA and empty cells should be missing"
+
+    print("\n✅ CSV reader keeps pandas semantics")
+
+if __name__ == "__main__":
+    test_read_csv_matches_pandas_dtypes()
@@ -11,7 +11,10 @@ Per Cahier des Charges Section 3.6:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import time
+import threading
 from typing import Optional, Dict, Any
 from enum import Enum
 
@@ -19,6 +22,7 @@ from enum import Enum
 RANGER_URL = os.getenv("RANGER_URL", "http://100.91.176.196:6080")
 RANGER_USER = os.getenv("RANGER_USER", "admin")
 RANGER_PASSWORD = os.getenv("RANGER_PASSWORD", "hortonworks1")
+POLICY_CACHE_TTL = int(os.getenv("RANGER_POLICY_CACHE_TTL", "60"))
 
 
 class AccessDecision(Enum):
@@ -34,72 +38,118 @@ class RangerClient:
         self.base_url = base_url
         self.auth = (user, password)
         self.tag_service = "data_gov_tags"
+        
+        # Keep-alive connection pool shared by every call on this client
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Parsed policy list, refreshed at most once per POLICY_CACHE_TTL
+        self._policies: Optional[list] = None
+        self._policy_index: Dict[str, Dict[str, Any]] = {}
+        self._policies_expires = 0.0
+        self._policies_lock = threading.Lock()
     
-    def check_access(self, username: str, resource_tag: str = "PII") -> Dict[str, Any]:
+    def get_policies(self) -> Optional[list]:
         """
-        Check if a user has access to a resource with a specific tag.
+        Return the tag service policies, cached for POLICY_CACHE_TTL seconds.
         
-        Args:
-            username: The user requesting access
-            resource_tag: The tag on the resource (default: PII)
-            
-        Returns:
-            Dict with 'decision' (AccessDecision) and 'mask_type' if applicable
+        Returns None if Ranger answered with an error status.
         """
-        try:
-            # Get all policies for our tag service
-            resp = requests.get(
+        if self._policies is not None and time.monotonic() < self._policies_expires:
+            return self._policies
+        
+        # Only one thread refreshes; the others wait and reuse its result
+        with self._policies_lock:
+            if self._policies is not None and time.monotonic() < self._policies_expires:
+                return self._policies
+            
+            resp = self.session.get(
                 f"{self.base_url}/service/plugins/policies",
                 params={"serviceName": self.tag_service},
-                auth=self.auth,
                 timeout=5
             )
             
             if resp.status_code != 200:
                 print(f"Ranger API error: {resp.status_code}")
-                return {"decision": AccessDecision.DENIED, "reason": "Ranger unavailable"}
+                return None
             
             policies = resp.json().get('policies', [])
+            self._policy_index = self._build_policy_index(policies)
+            self._policies = policies
+            self._policies_expires = time.monotonic() + POLICY_CACHE_TTL
+            return self._policies
+    
+    @staticmethod
+    def _build_policy_index(policies: list) -> Dict[str, Dict[str, Any]]:
+        """
+        Fold enabled policies into a per-tag lookup so check_access is a few
+        set/dict hits instead of a scan over every policy item.
+        """
+        index: Dict[str, Dict[str, Any]] = {}
+        
+        for policy in policies:
+            if not policy.get('isEnabled', False):
+                continue
             
-            # Check policies in order:
-            # 1. First check deny policies
-            # 2. Then check allow policies
-            # 3. Then check masking policies
-            
-            is_denied = False
-            is_allowed = False
-            mask_type = None
-            
-            for policy in policies:
-                if not policy.get('isEnabled', False):
-                    continue
-                    
-                # Check if this policy applies to the requested tag
-                policy_tags = policy.get('resources', {}).get('tag', {}).get('values', [])
-                if resource_tag not in policy_tags:
-                    continue
+            for tag in policy.get('resources', {}).get('tag', {}).get('values', []):
+                entry = index.setdefault(tag, {
+                    "deny_users": set(),
+                    "deny_public": False,
+                    "allow_users": set(),
+                    "mask_by_user": {}
+                })
                 
-                # Check deny items
                 for deny_item in policy.get('denyPolicyItems', []):
-                    if username in deny_item.get('users', []):
-                        is_denied = True
-                        break
+                    entry["deny_users"].update(deny_item.get('users', []))
                     if 'public' in deny_item.get('groups', []):
                         # User might be in public group
-                        is_denied = True
-                        
-                # Check allow items
+                        entry["deny_public"] = True
+                
                 for allow_item in policy.get('policyItems', []):
-                    if username in allow_item.get('users', []):
-                        is_allowed = True
-                        is_denied = False  # Explicit allow overrides public deny
-                        break
+                    entry["allow_users"].update(allow_item.get('users', []))
                 
-                # Check masking items (policyType == 1)
+                # Masking items (policyType == 1); later policies win
                 if policy.get('policyType') == 1:
                     for mask_item in policy.get('dataMaskPolicyItems', []):
-                        if username in mask_item.get('users', []):
-                            mask_type = mask_item.get('dataMaskInfo', {}).get('dataMaskType', 'MASK')
+                        mask_type = mask_item.get('dataMaskInfo', {}).get('dataMaskType', 'MASK')
+                        for user in mask_item.get('users', []):
+                            entry["mask_by_user"][user] = mask_type
+        
+        return index
+    
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+    
+    def check_access(self, username: str, resource_tag: str = "PII") -> Dict[str, Any]:
+        """
+        Check if a user has access to a resource with a specific tag.
+        
+        Args:
+            username: The user requesting access
+            resource_tag: The tag on the resource (default: PII)
+            
+        Returns:
+            Dict with 'decision' (AccessDecision) and 'mask_type' if applicable
+        """
+        try:
+            # Get all policies for our tag service
+            policies = self.get_policies()
+            
+            if policies is None:
+                return {"decision": AccessDecision.DENIED, "reason": "Ranger unavailable"}
+            
+            entry = self._policy_index.get(resource_tag)
+            if entry is None:
+                return {"decision": AccessDecision.DENIED, "reason": "No explicit allow policy"}
+            
+            # Explicit allow overrides public deny
+            is_allowed = username in entry["allow_users"]
+            is_denied = username in entry["deny_users"] or entry["deny_public"]
+            mask_type = entry["mask_by_user"].get(username)
             
             # Determine final decision
             if is_denied and not is_allowed:
@@ -241,7 +241,7 @@ async def mask_data(request: MaskRequest):
             "masking_level": level.value,
             "technique": tech_used,
             "role": request.config.role.value,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.utcnow()
         })
     
     # Batch insert audit logs
@@ -296,11 +296,13 @@ async def update_config(config: ConfigUpdate):
 async def get_audit_logs(limit: int = 100):
     """Get recent audit logs"""
     if db is not None:
-        cursor = db.audit_logs.find().sort("timestamp", -1).limit(limit)
-        logs = []
-        async for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            logs.append(doc)
+        # ObjectId -> str is done by Mongo, not per document in Python
+        cursor = db.audit_logs.aggregate([
+            {"$sort": {"timestamp": -1}},
+            {"$limit": limit},
+            {"$addFields": {"_id": {"$toString": "$_id"}}}
+        ])
+        logs = await cursor.to_list(length=limit)
         return {"logs": logs}
     return {"logs": []}
 
@@ -3,6 +3,9 @@ from typing import List, Optional
 from presidio_analyzer import Pattern
 from .moroccan_base_recognizer import MoroccanPatternRecognizer
 
+# Full-string format check (fullmatch: no anchors, no end-of-line ambiguity)
+PASSPORT_FORMAT = re.compile(r"[A-Z]{2}\d{6,7}")
+
 
 class MoroccanPassportRecognizer(MoroccanPatternRecognizer):
     """
@@ -35,7 +38,7 @@ class MoroccanPassportRecognizer(MoroccanPatternRecognizer):
         
         # Validator: check length and prefix
         def passport_validator(text: str) -> bool:
-            return bool(re.match(r"^[A-Z]{2}\d{6,7}$", text.strip().upper()))
+            return bool(PASSPORT_FORMAT.fullmatch(text.strip().upper()))
 
         super().__init__(
             supported_entity=supported_entity,
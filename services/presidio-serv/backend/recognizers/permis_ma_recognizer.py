@@ -3,6 +3,9 @@ from typing import List, Optional
 from presidio_analyzer import Pattern
 from .moroccan_base_recognizer import MoroccanPatternRecognizer
 
+# Full-string format check (fullmatch: no anchors, no end-of-line ambiguity)
+PERMIS_FORMAT = re.compile(r"[A-Z0-9]{6,12}")
+
 
 class MoroccanPermisRecognizer(MoroccanPatternRecognizer):
     """
@@ -35,7 +38,7 @@ class MoroccanPermisRecognizer(MoroccanPatternRecognizer):
         
         # Validator for Algorithm 3: check length and alphanumeric format
         def permis_validator(text: str) -> bool:
-            return bool(re.match(r"^[A-Z0-9]{6,12}$", text.strip().upper()))
+            return bool(PERMIS_FORMAT.fullmatch(text.strip().upper()))
 
         super().__init__(
             supported_entity=supported_entity,
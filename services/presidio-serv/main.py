@@ -7,6 +7,7 @@ According to Cahier des Charges:
 - Add recognizers: CIN, Phone MA, IBAN MA, CNSS
 - Support French and Arabic
 """
+import os
 import uvicorn
 from typing import List, Optional
 from fastapi import FastAPI, HTTPException, Request
@@ -15,7 +16,7 @@ from pydantic import BaseModel, Field
 
 # Presidio imports
 try:
-    from presidio_analyzer import AnalyzerEngine, RecognizerRegistry
+    from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine, RecognizerRegistry
     from presidio_analyzer.nlp_engine import NlpEngineProvider
     from presidio_anonymizer import AnonymizerEngine
     from presidio_anonymizer.entities import OperatorConfig
@@ -36,6 +37,11 @@ if PRESIDIO_AVAILABLE:
     # International recognizers
     from backend.recognizers.international_recognizers import register_all_international
 
+# Texts handed to spaCy's nlp.pipe per chunk, and the most texts one
+# /analyze/batch request may carry
+BATCH_SIZE = int(os.getenv("PRESIDIO_BATCH_SIZE", "32"))
+BATCH_MAX_TEXTS = int(os.getenv("PRESIDIO_BATCH_MAX_TEXTS", "1000"))
+
 # ====================================================================
 # MODELS
 # ====================================================================
@@ -46,6 +52,12 @@ class AnalyzeRequest(BaseModel):
     entities: Optional[List[str]] = Field(default=None, description="Specific entities to detect")
     score_threshold: float = Field(default=0.3, ge=0.0, le=1.0)
 
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str] = Field(..., description="Texts to analyze (e.g. one per cell value)", min_length=1, max_length=BATCH_MAX_TEXTS)
+    language: str = Field(default="fr", description="Language (fr/en/ar)")
+    entities: Optional[List[str]] = Field(default=None, description="Specific entities to detect")
+    score_threshold: float = Field(default=0.3, ge=0.0, le=1.0)
+
 class AnonymizeRequest(BaseModel):
     text: str = Field(..., description="Text to anonymize", min_length=1)
     language: str = Field(default="fr")
@@ -64,6 +76,11 @@ class AnalyzeResponse(BaseModel):
     detections: List[Detection]
     count: int
 
+class BatchAnalyzeResponse(BaseModel):
+    success: bool
+    results: List[List[Detection]]
+    count: int
+
 class AnonymizeResponse(BaseModel):
     success: bool
     original_text: str
@@ -149,18 +166,42 @@ class MoroccanPresidioEngine:
             return_decision_process=True # Enable explanations
         )
         
+        return [self._to_detection(text, r) for r in results]
+    
+    def analyze_batch(self, texts: List[str], language: str = "fr",
+                      entities: Optional[List[str]] = None,
+                      score_threshold: float = 0.5) -> List[List[dict]]:
+        """Analyze many short texts in one pass (spaCy nlp.pipe under the hood)"""
+        if not self.analyzer:
+            return [[] for _ in texts]
+        
+        lang = "fr" if language in ["fr", "ar"] else "en"
+        
+        batch_results = BatchAnalyzerEngine(analyzer_engine=self.analyzer).analyze_iterator(
+            texts=texts,
+            language=lang,
+            batch_size=BATCH_SIZE,
+            entities=entities,
+            score_threshold=score_threshold,
+            return_decision_process=True
+        )
+        
         return [
-            {
-                "entity_type": r.entity_type,
-                "start": r.start,
-                "end": r.end,
-                "score": round(r.score, 3),
-                "value": text[r.start:r.end],
-                "analysis_explanation": getattr(r.analysis_explanation, 'textual_explanation', str(r.analysis_explanation)) if r.analysis_explanation else f"Detected {r.entity_type} with {round(r.score*100)}% confidence"
-            }
-            for r in results
+            [self._to_detection(text, r) for r in results]
+            for text, results in zip(texts, batch_results)
         ]
     
+    @staticmethod
+    def _to_detection(text: str, r) -> dict:
+        return {
+            "entity_type": r.entity_type,
+            "start": r.start,
+            "end": r.end,
+            "score": round(r.score, 3),
+            "value": text[r.start:r.end],
+            "analysis_explanation": getattr(r.analysis_explanation, 'textual_explanation', str(r.analysis_explanation)) if r.analysis_explanation else f"Detected {r.entity_type} with {round(r.score*100)}% confidence"
+        }
+    
     def anonymize(self, text: str, language: str = "fr",
                   operators: Optional[dict] = None) -> dict:
         """Anonymize detected PII"""
@@ -266,6 +307,25 @@ async def analyze(request: AnalyzeRequest):
         count=len(detections)
     )
 
+@app.post("/analyze/batch", response_model=BatchAnalyzeResponse)
+def analyze_batch(request: BatchAnalyzeRequest):
+    """Analyze a list of texts for PII in a single request"""
+    if not engine:
+        raise HTTPException(status_code=503, detail="Presidio not available")
+    
+    results = engine.analyze_batch(
+        texts=request.texts,
+        language=request.language,
+        entities=request.entities,
+        score_threshold=request.score_threshold
+    )
+    
+    return BatchAnalyzeResponse(
+        success=True,
+        results=[[Detection(**d) for d in detections] for detections in results],
+        count=sum(len(detections) for detections in results)
+    )
+
 @app.post("/anonymize", response_model=AnonymizeResponse)
 async def anonymize(request: AnonymizeRequest):
     """Anonymize PII in text"""
@@ -425,7 +425,7 @@ async def evaluate_quality(dataset_id: str, config: EvaluationConfig = None):
             "action": "QUALITY_EVALUATION",
             "user": "system",  # TODO: Get from token
             "status": "INFO" if global_score >= 60 else "WARNING",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.utcnow(),
             "details": {
                 "dataset_id": dataset_id,
                 "global_score": global_score,
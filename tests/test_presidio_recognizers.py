@@ -14,6 +14,7 @@ Tests all Moroccan custom recognizers:
 import pytest
 import sys
 import os
+import time
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services', 'presidio-serv'))
@@ -296,13 +297,11 @@ class TestPerformance:
     
     def test_response_time(self, analyzer):
         """Test that analysis completes in < 500ms (Cahier requirement)"""
-        import time
-        
         text = "CIN: AB123456, Tel: +212612345678, IBAN: MA12BANK12345678901234567890" * 10
         
-        start = time.time()
+        start = time.perf_counter_ns()
         results = analyzer.analyze(text, language='en')
-        duration = time.time() - start
+        duration = (time.perf_counter_ns() - start) / 1e9
         
         # Cahier requirement: < 500ms
         assert duration < 0.5, f"Analysis took {duration:.3f}s, should be < 0.5s"